@@ -1,16 +1,23 @@
 #reference: https://github.com/devicetree-org/devicetree-specification/releases ; v0.3
 from pathlib import Path
+import mmap
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum, auto
 
 import re
-import pprint
+import bisect
+import sys
+import os
+import pickle
+import hashlib
 
 #from treelib import Tree, Node
-from anytree import Node, RenderTree, NodeMixin, PreOrderIter
+from anytree import Node, RenderTree, NodeMixin
 
-from typing import Union, List
+from typing import Union, List, Dict, Final
 
-DEBUG=False
+DEBUG:Final[bool]=False
+'''every debug block is guarded by "if __debug__ and DEBUG:": under python -O, __debug__ is the constant False and the compiler drops those blocks entirely'''
 
 class Token:
 
@@ -72,13 +79,43 @@ class Regex:
 
     boring = re.compile(r'^\s*$')
 
-    root_node = re.compile(r'/ {')
+    root_node = re.compile(rb'/ {')
 
     node = re.compile(f'(?P<name>{valid_node_name})(?:@(?P<value>{valid_node_name})) +{{')
-    
+
+    # visualization
+    # https://regexper.com/#%28%3F%3A%28%3F%3A%28%26%28%5B%5Cw%2C.%2B%5C-%2F%5D%2B%29%29%7C%28%28%3F%3A%28%5B%5Cw%2C.%2B%5C-%2F%5D%2B%29%20*%3A%20*%29%3F%28%5B%5Cw%2C.%2B%5C-%2F%5D%2B%29%28%3F%3A%40%28%5B%5Cw%2C.%2B%5C-%5D%2B%29%29%3F%29%29%20*%7B%29%7C%28%20*%7D%3B%29
+    # device tree specification v0.3 (13/feb/2020): https://github.com/devicetree-org/devicetree-specification/releases/tag/v0.3
+    # labels (phandles) : section 6.2 : [\w]+
+    # node name : section 2.2.1 : [\w,.\+\-]+
+    # unit-address : section 2.2.1 (same as nome name) : [\w,.\+\-]+
+    # every top level alternative is a named group, so match.lastgroup tells which one matched: 'overlay', 'node' or 'node_end'
+    # it is a bytes pattern: it runs directly over the memory mapped file
+    node_scopes = re.compile(rb'(?P<overlay>&(?P<phandle_only>[\w]+) *{)|(?P<node>(?:(?P<phandle>[\w,.+\-]+) *: *)?(?P<name>[\w,.+\-/]+)(?:@(?P<at>[\w,.+\-]+))? *{)|(?P<node_end> *};)')
+
+    linefeed = re.compile(rb'\n')
+    blank = re.compile(rb'[ \t\n]*')
+
+    # the property value patterns are ASCII only (like the bytes node_scopes): device tree names are ASCII and \w/\s skip the unicode tables
+    string_property = re.compile(r'^"([^\n;"]*)"$')
+    # same language as <((?:&?\w+\s*)+)>, but every split of the tokens is unique (they are separated by whitespace and/or a leading &),
+    # so a value that is not a single cell (e.g. '<0x1 0x2 ... 0xN>, <0>') fails in linear time instead of backtracking exponentially
+    cell = re.compile(r'^<(&?\w+(?:(?:\s+&?|&)\w+)*\s*)>$', re.ASCII)
+    alias = re.compile(r'^(&[\w]+)$', re.ASCII)
+    # a bytestring: whitespace separated runs of hex byte pairs (like [00 11 22] or [000012345678]), each with an optional 0x;
+    # runs are separated by whitespace and split in pairs, so an unclosed '[0011...' fails in linear time instead of backtracking exponentially
+    # and a run with an odd number of digits (like [123]) is not a bytestring
+    binary_property = re.compile(r'^\[\s*(?:0[xX])?(?:[a-fA-F0-9]{2})+(?:\s+(?:0[xX])?(?:[a-fA-F0-9]{2})+)*\s*\]$', re.ASCII)
+    binary_element = re.compile(r'(?:0[xX])?((?:[a-fA-F0-9]{2})+)', re.ASCII)
+    '''the hex digits of each run of a bytestring, without its 0x'''
+    empty_property = re.compile(f'^({valid_property_name})$', re.ASCII)
+
     
 class DeviceTreeNode(NodeMixin):
 
+    # NodeMixin itself has no __slots__, so anytree's parent/children bookkeeping still lives in __dict__
+    __slots__ = ('name', '_at', '_phandle', '_properties', '_is_overlay', '_file_path_source', '_properties_span', '_node_span')
+
     StringProperty = str
     '''string-property = "a string";'''
     CellProperty = List[int]
@@ -92,6 +129,12 @@ class DeviceTreeNode(NodeMixin):
     EmptyProperty = bool
     '''wakeup-source;'''
 
+    missing_property = object()
+    '''sentinel for single lookup dict operations on the properties (a property value can legitimately be None)'''
+
+    unset_span = (-1, -1)
+    '''shared by every node until its spans are set (spans are immutable tuples, so no per-node list is allocated up front)'''
+
     #TODO: remove the default file_path_source
     def __init__(self, name:str, is_overlay:bool=False, file_path_source:Path=Path(), phandle:str=None, at:Union[str,int]=None, parent=None, children=None):
         if is_overlay and (phandle or at):
@@ -106,29 +149,30 @@ class DeviceTreeNode(NodeMixin):
         self.name:str = name
         self._is_overlay = is_overlay
         self._file_path_source = file_path_source
-        self._properties_span = [-1, -1]
-        self._node_span = [-1, -1]
+        self._properties_span = DeviceTreeNode.unset_span
+        self._node_span = DeviceTreeNode.unset_span
 
         self.parent = parent
-        self.children = [] if children == None else children
+        if not children == None:
+            '''a new node already has no children: assigning an empty list would only run anytree's detach/attach machinery for nothing'''
+            self.children = children
 
     def add_property(self, name:str, value:Union[StringProperty,CellProperty, BinaryProperty, MixedProperty, StringListProperty]) -> None:
-        if name in self._properties.keys():
+        name = sys.intern(name) # the same few property names (compatible, reg, status...) repeat all over the tree
+        properties_count = len(self._properties)
+        self._properties.setdefault(name, value) # a single hash lookup: the dict only grows if the name is new
+        if len(self._properties) == properties_count:
             raise KeyError(f'Property {name} already exist!')
-        else:
-            self._properties[name] = value
 
     def modify_property(self, name:str, value:Union[str,None]) -> None:
-        if not name in self._properties.keys():
+        if name not in self._properties:
             raise KeyError(f'Property {name} can not be modified because it does not exist yet!')
         else:
             self._properties[name] = value
 
     def remove_property(self, name:str)-> None:
-        if self._properties.get(name) == None:
+        if self._properties.pop(name, DeviceTreeNode.missing_property) is DeviceTreeNode.missing_property:
             raise KeyError(f'Property {name} can not be modified because it does not exist!')
-        else:
-            self._properties.pop(name)
 
     # def set_phandle(self, phandle:str) -> None:
     #     if not self._phandle == None:
@@ -149,19 +193,19 @@ class DeviceTreeNode(NodeMixin):
         return self._at
 
     def set_properties_span_start(self, span_start:int):
-        self._properties_span[0] = span_start
+        self._properties_span = (span_start, self._properties_span[1])
 
     def set_properties_span_end(self, span_end:int):
-        self._properties_span[1] = span_end
+        self._properties_span = (self._properties_span[0], span_end)
 
     def get_properties_span(self):
         return self._properties_span
 
     def set_node_span_start(self, span_start:int):
-        self._node_span[0] = span_start
+        self._node_span = (span_start, self._node_span[1])
 
     def set_node_span_end(self, span_end:int):
-        self._node_span[1] = span_end
+        self._node_span = (self._node_span[0], span_end)
 
     def get_node_span(self):
         return self._node_span
@@ -180,33 +224,125 @@ class DeviceTreeNode(NodeMixin):
 
         return string
 
-def get_line_number(text_contents):
-    return len(text_contents.split('\n'))
-
-def parse_device_tree(file_path:Path) -> None:
+def decode_group(match:re.Match, group:str) -> Union[str, None]:
+    '''decodes a group of a match over the (bytes) file contents, keeping None for groups that did not participate
+    (names, labels and unit addresses repeat a lot across a device tree, so they are interned)'''
+    value = match[group]
+    return None if value == None else sys.intern(value.decode())
+
+def get_line_number(text_contents:str, end:int=None) -> int:
+    '''line number of the character at end (or of the last character) of text_contents, counting without building a list of lines
+    (passing end avoids slicing text_contents[:end])'''
+    return text_contents.count('\n', 0, end) + 1
+
+def iterate_pre_order(root:DeviceTreeNode):
+    '''yields root and all its descendants in the same order as anytree's PreOrderIter,
+    but with a plain stack instead of its generic filter/stop/maxlevel machinery'''
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+def get_line_starts(contents:bytes) -> List[int]:
+    '''offset of the first character of every line in contents (built once per file, in a single scan)'''
+    line_starts = [0]
+    line_starts.extend(linefeed.end() for linefeed in Regex.linefeed.finditer(contents))
+    return line_starts
+
+def get_line_number_at(line_starts:List[int], position:int) -> int:
+    '''line number (starting at 1) of the character at position, given the line starts of its file'''
+    return bisect.bisect_right(line_starts, position)
+
+comment_blanking = bytes(byte if byte == ord('\n') else ord(' ') for byte in range(256))
+'''bytes.translate table that turns every byte of a comment into a space, except its linefeeds'''
+
+def find_string_end(contents:bytes, quote:int) -> int:
+    '''offset of the double quote that closes the string literal opened by the one at quote (skipping escaped ones, like "a \\"b\\" c"),
+    or -1 if the string is never closed'''
+    end = contents.find(b'"', quote + 1)
+    while end != -1:
+        backslashes = 0
+        while contents[end - 1 - backslashes] == ord('\\'):
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end
+        end = contents.find(b'"', end + 1)
+    return -1
+
+def blank_comments(contents:bytes) -> bytes:
+    '''replaces every /* ... */ and // ... comment in contents by spaces (keeping its linefeeds), in a single pass, whichever starts first,
+    so no brace inside a comment is taken as a node and every offset (and line number) stays the same
+    (a /* or // inside a "string literal" is part of the string, not a comment; an unterminated /* comment is kept as is;
+    contents itself is returned when it has no comments, without a copy)'''
+    block_start = contents.find(b'/*')
+    line_start = contents.find(b'//')
+    if block_start == -1 and line_start == -1:
+        return contents
+    quote = contents.find(b'"')
+
+    parts = []
+    position = 0
+    while block_start != -1 or line_start != -1:
+        is_block = line_start == -1 or (block_start != -1 and block_start < line_start)
+        comment_start = block_start if is_block else line_start
+        if quote != -1 and quote < comment_start:
+            '''a string literal starts first: skipping it, with every comment marker inside of it'''
+            string_end = find_string_end(contents, quote)
+            if string_end == -1:
+                break
+            position_after_string = string_end + 1
+            if block_start != -1 and block_start < position_after_string:
+                block_start = contents.find(b'/*', position_after_string)
+            if line_start != -1 and line_start < position_after_string:
+                line_start = contents.find(b'//', position_after_string)
+            quote = contents.find(b'"', position_after_string)
+            continue
+        if is_block:
+            end = contents.find(b'*/', block_start + 2)
+            if end == -1:
+                block_start = -1
+                continue
+            comment_end = end + 2
+        else:
+            end = contents.find(b'\n', line_start + 2)
+            comment_end = len(contents) if end == -1 else end
+        parts.append(contents[position:comment_start])
+        parts.append(contents[comment_start:comment_end].translate(comment_blanking))
+        position = comment_end
+        if block_start != -1 and block_start < position:
+            block_start = contents.find(b'/*', position)
+        if line_start != -1 and line_start < position:
+            line_start = contents.find(b'//', position)
+        if quote != -1 and quote < position:
+            quote = contents.find(b'"', position)
+    parts.append(contents[position:])
+    return b''.join(parts)
+
+def parse_device_tree(file_path:Path) -> List[DeviceTreeNode]:
     if not file_path.exists():
         raise FileExistsError(f"{file_path} does not exist!")
 
     if not file_path.is_file():
         raise FileExistsError(f"{file_path} is not a file!")
 
-    with open(file_path, 'r') as f:
-        contents = f.read()
-    
+    if file_path.stat().st_size == 0:
+        raise ValueError(f'Root node ( / ) could not be found in {file_path}!')
+
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        '''the file is memory mapped (read only): the regexes scan the page cache directly, without a copy into a str
+        (the mapping is closed on every exit, including every error raised while parsing)'''
+        return parse_device_tree_contents(blank_comments(mapped_file), file_path)
+
+def parse_device_tree_contents(contents:bytes, file_path:Path) -> List[DeviceTreeNode]:
+    '''parses the (comment blanked) contents of file_path, see parse_device_tree'''
     root_node:re.Match=Regex.root_node.search(contents)
 
     if root_node == None:
         raise ValueError(f'Root node ( / ) could not be found in {file_path}!')
 
-    print(contents[root_node.span()[0]:root_node.span()[1]])
-
-    # visualization
-    # https://regexper.com/#%28%3F%3A%28%3F%3A%28%26%28%5B%5Cw%2C.%2B%5C-%2F%5D%2B%29%29%7C%28%28%3F%3A%28%5B%5Cw%2C.%2B%5C-%2F%5D%2B%29%20*%3A%20*%29%3F%28%5B%5Cw%2C.%2B%5C-%2F%5D%2B%29%28%3F%3A%40%28%5B%5Cw%2C.%2B%5C-%5D%2B%29%29%3F%29%29%20*%7B%29%7C%28%20*%7D%3B%29
-    # device tree specification v0.3 (13/feb/2020): https://github.com/devicetree-org/devicetree-specification/releases/tag/v0.3
-    # labels (phandles) : section 6.2 : [\w]+
-    # node name : section 2.2.1 : [\w,.\+\-]+
-    # unit-address : section 2.2.1 (same as nome name) : [\w,.\+\-]+
-    node_scopes = re.finditer(r'((?:(&(?P<phandle_only>[\w]+))|((?:(?P<phandle>[\w,.+\-]+) *: *)?(?P<name>[\w,.+\-/]+)(?:@(?P<at>[\w,.+\-]+))?)) *{)|( *};)',contents)
+    if __debug__ and DEBUG:
+        print(contents[root_node.start():root_node.end()].decode())
 
     c=0
     '''double of the amount of nodes'''
@@ -217,6 +353,10 @@ def parse_device_tree(file_path:Path) -> None:
     current_node = None
     '''current node being evaluated'''
 
+    node_stack = []
+    '''nodes opened (by a "{") and not closed yet (by a "};"), the innermost one on top: closing a node just pops it,
+    without going through anytree's parent property'''
+
     root_nodes = []
     '''every node that is not inside of another node in the current file
     (in other words: the root node ("/") and every "overlay" node in the current file)'''
@@ -228,125 +368,126 @@ def parse_device_tree(file_path:Path) -> None:
 
     math:re.Match
     '''for iteration over regexp matches in this file'''
-    for match in node_scopes:
-        if match[0][-1] == '{':
+    for match in Regex.node_scopes.finditer(contents): # not kept in a variable: a live scanner would keep the mapped file from being closed
+        kind = match.lastgroup
+        '''which alternative of Regex.node_scopes matched (classified by the regex engine itself)'''
+        if kind == 'node':
             '''here we have the start of a node'''
             node_count+=1
 
-            node_header = match.groupdict()
-            if node_header['phandle_only'] == None:
-                '''this not is not an overlay node'''
-                node_header.pop('phandle_only')
-                if node_header['name'] == '/':
-                    '''this is the root node'''
-                    current_node = DeviceTreeNode(**node_header)
-                    root_nodes.append(current_node)
+            if match['name'] == b'/':
+                '''this is the root node'''
+                current_node = DeviceTreeNode(name=decode_group(match, 'name'), phandle=decode_group(match, 'phandle'), at=decode_group(match, 'at'), file_path_source=file_path)
+                root_nodes.append(current_node)
+                node_stack.append(current_node)
+            else:
+                '''not the root node and not an overlay node'''
+                if current_node.get_properties_span()[1] == -1:
+                    '''if we found a new node, the property section of the previous node has to end'''
+                    current_node.set_properties_span_end(match.start())
+                new_node = DeviceTreeNode(name=decode_group(match, 'name'), phandle=decode_group(match, 'phandle'), at=decode_group(match, 'at'), parent=current_node, file_path_source=file_path)
+                current_node = new_node
+                node_stack.append(current_node)
+
+            '''grabbing the start of the node property (it is the first character that indicates a property)'''
+            carret_position = Regex.blank.match(contents, match.end()).end() # skipping the whole blank run in a single C level match
+            if carret_position >= len(contents):
+                raise ValueError(f'Reached End Of File {file_path}!')
+            current_node.set_properties_span_start(carret_position)
+            if __debug__ and DEBUG:
+                if contents[current_node.get_properties_span()[0]] == ord('\n'):
+                    print(f'{current_node.name} : first property char is linefeed {node_count}')
                 else:
-                    '''not the root node and not an overlay node'''
-                    if current_node.get_properties_span()[1] == -1:
-                        '''if we found a new node, the property section of the previous node has to end'''
-                        current_node.set_properties_span_end(match.span()[0])
-                    new_node = DeviceTreeNode(**node_header, parent=current_node)
-                    current_node = new_node
-
-                '''grabbing the start of the node property (it is the first character that indicates a property)'''
-                carret_position = match.span()[1]
-                while contents[carret_position] == ' ' or contents[carret_position] == '\t' or contents[carret_position] == '\n':
-                    carret_position += 1
-                    if carret_position > len(contents):
-                        raise ValueError(f'Reached End Of File {file_path}!')
+                    print(f'{current_node.name} : first property char is NOT linefeed: {chr(contents[current_node.get_properties_span()[0]])} {node_count}')
+            current_node.set_node_span_start(match.end())
+
+            if __debug__ and DEBUG:
+                print(f'{pre}{current_node.name} start')
+                t+=1
+                pre='.'*t
+        elif kind == 'overlay':
+            '''here we have an overlay node'''
+            node_count+=1
+
+            if not current_node == None:
+                '''an overlay node can not not be inside any other node (or can it?)'''
+                raise KeyError(f'This {match[0].decode()} node is only a phandle. Should this be inside a node ({current_node.name})? Is this allowable?')
+            else:
+                '''the overlay node is not inside another node'''
+                current_node = DeviceTreeNode(name=decode_group(match, 'phandle_only'), is_overlay=True, file_path_source=file_path)
+                root_nodes.append(current_node)
+                node_stack.append(current_node)
+                current_node.set_node_span_start(match.end())
+                carret_position = Regex.blank.match(contents, match.end()).end() # skipping the whole blank run in a single C level match
+                if carret_position >= len(contents):
+                    raise ValueError(f'Reached End Of File {file_path}!')
                 current_node.set_properties_span_start(carret_position)
-                if DEBUG:
-                    if contents[current_node.get_properties_span()[0]] == '\n':
+                if __debug__ and DEBUG:
+                    if contents[current_node.get_properties_span()[0]] == ord('\n'):
                         print(f'{current_node.name} : first property char is linefeed {node_count}')
                     else:
-                        print(f'{current_node.name} : first property char is NOT linefeed: {contents[current_node.get_properties_span()[0]]} {node_count}')
-                current_node.set_node_span_start(match.span()[1])
+                        print(f'{current_node.name} : first property char is NOT linefeed: {chr(contents[current_node.get_properties_span()[0]])} {node_count}')
+
 
-                if DEBUG:
+                if __debug__ and DEBUG:
                     print(f'{pre}{current_node.name} start')
                     t+=1
                     pre='.'*t
-            else:
-                '''here we have an overlay node'''
-                if not current_node == None:
-                    '''an overlay node can not not be inside any other node (or can it?)'''
-                    raise KeyError(f'This {match[0]} node is only a phandle. Should this be inside a node ({current_node.name})? Is this allowable?')
-                else:
-                    '''the overlay node is not inside another node'''
-                    current_node = DeviceTreeNode(name=node_header['phandle_only'], is_overlay=True)
-                    root_nodes.append(current_node)
-                    current_node.set_node_span_start(match.span()[1])
-                    carret_position = match.span()[1]
-                    while contents[carret_position] == ' ' or contents[carret_position] == '\t' or contents[carret_position] == '\n':
-                        carret_position += 1
-                        if carret_position > len(contents):
-                            raise ValueError(f'Reached End Of File {file_path}!')
-                    current_node.set_properties_span_start(carret_position)
-                    if DEBUG:
-                        if contents[current_node.get_properties_span()[0]] == '\n':
-                            print(f'{current_node.name} : first property char is linefeed {node_count}')
-                        else:
-                            print(f'{current_node.name} : first property char is NOT linefeed: {contents[current_node.get_properties_span()[0]]} {node_count}')
-
-
-                    if DEBUG:
-                        print(f'{pre}{current_node.name} start')
-                        t+=1
-                        pre='.'*t
-
-
-        elif match[0] == '};' and match.groupdict()['name'] == None:
-            if DEBUG:
+
+
+        elif kind == 'node_end':
+            if __debug__ and DEBUG:
                 t-=1
                 pre='.'*t
                 print(f'{pre}{current_node.name} end')
             if current_node.get_properties_span()[1] == -1:
-                current_node.set_properties_span_end(match.span()[0])
-            current_node.set_node_span_end(match.span()[0])
-            current_node = current_node.parent
+                current_node.set_properties_span_end(match.start())
+            current_node.set_node_span_end(match.start())
+            node_stack.pop()
+            current_node = node_stack[-1] if node_stack else None
         else:
             raise ValueError('deu ruim')
         c += 1
 
-    if DEBUG:
-        print(list(PreOrderIter(root_nodes[0])))
+    if __debug__ and DEBUG:
+        print(list(iterate_pre_order(root_nodes[0])))
 
-    if DEBUG:
+    if __debug__ and DEBUG:
         for rn in root_nodes:
-            for node in PreOrderIter(rn):
+            for node in iterate_pre_order(rn):
                 print(node, type(node))
                 print(node.get_properties_span())
-                print('/**/',contents[node.get_properties_span()[0]:node.get_properties_span()[1]],'/**/')
+                print('/**/',contents[node.get_properties_span()[0]:node.get_properties_span()[1]].decode(),'/**/')
 
-    if DEBUG:
+    if __debug__ and DEBUG:
         for rn in root_nodes:
-            print(RenderTree(rn))
+            sys.stdout.writelines(f'{row.pre}{row.node!r}\n' for row in RenderTree(rn)) # line by line, without joining the whole rendered tree into one string
 
     '''
     at this point we have al spans for each node and its properties
     time to parse it all
     '''
 
-    print('\n\nproperties time\n\n')
+    if __debug__ and DEBUG:
+        print('\n\nproperties time\n\n')
+        line_starts = get_line_starts(contents)
 
     for root in root_nodes:
         node:DeviceTreeNode
-        for node in PreOrderIter(root):
+        for node in iterate_pre_order(root):
+            properties_start, properties_end = node.get_properties_span() # read once per node
 
-            if DEBUG:
+            if __debug__ and DEBUG:
                 print(f'==|{node.name}|==')
 
-            # TODO: find a way to not lose the original position of each thing in the original file!!!
-            index_first_char = get_line_number(contents[:node.get_properties_span()[0]])
-            w=20
-            print(f'{index_first_char:{w-10}} {node.name:{w}} {contents[node.get_properties_span()[0]:node.get_properties_span()[0]+10]:{w}}')
-            properties_lines = contents[node.get_properties_span()[0]:node.get_properties_span()[1]] # getting online the properties
-            properties_lines = re.sub(r'/\*[^*/]*\*/','', properties_lines) # removing multiline comments
-            properties_lines = re.sub(r'//[^\n]*','', properties_lines) # removing dingle line comments
-            properties_lines = re.sub(r'\n','', properties_lines) # removing linefeed (maybe it is not reeeally needed)
-            properties_lines = [p.strip() for p in properties_lines.split(";")] # splitting by the end of statements (? expressions ?)
-            properties_lines = [p for p in properties_lines if len(p) > 0] # removing 0-length strings
+                # TODO: find a way to not lose the original position of each thing in the original file!!!
+                index_first_char = get_line_number_at(line_starts, properties_start)
+                w=20
+                print(f'{index_first_char:{w-10}} {node.name:{w}} {contents[properties_start:properties_start+10].decode():{w}}')
+
+            properties_lines = contents[properties_start:properties_end].decode() # getting online the properties (only this slice is decoded)
+            properties_lines = properties_lines.replace('\n', '') # removing linefeed (maybe it is not reeeally needed)
+            properties_lines = [p for p in map(str.strip, properties_lines.split(";")) if p] # splitting by the end of statements (? expressions ?) and removing 0-length strings
 
             for line in properties_lines:
                 if len(line) == 0:
@@ -358,52 +499,122 @@ def parse_device_tree(file_path:Path) -> None:
                         '''it is a line with a key = value'''
                         key, value = [e.strip() for e in line.split('=')]
                         #print(f'|{key}| -- |{value}| -- ', end='')
-                        if DEBUG:
+                        if __debug__ and DEBUG:
                             print(f'    |{key}| -- ', end='')
-                        string_property = re.match(r'^"([^\n;"]*)"$', value)
-                        if string_property:
-                            if DEBUG:
-                                print('single string')
-                                print(f'        |{string_property.groups()[0]}|')
-                            node.add_property(key, value)
-                            continue
+                        first_char = value[:1]
+                        '''the first character tells the only kind of value this can be, so only its matcher runs'''
+                        if first_char == '"':
+                            string_property = Regex.string_property.match(value)
+                            if string_property:
+                                if __debug__ and DEBUG:
+                                    print('single string')
+                                    print(f'        |{string_property.groups()[0]}|')
+                                node.add_property(key, sys.intern(value)) # string values repeat a lot ("okay", "disabled", compatibles...)
+                                continue
+
+                            '''a string list is "one", "two", ...: splitting by the double quotes, the odd parts are the strings and the even ones have to be
+                            the commas between them (and nothing around the list), which is checked in one pass without a (backtracking) regex'''
+                            string_list = value.split('"')
+                            if len(string_list) >= 5 and len(string_list) % 2 == 1 and string_list[0] == '' and string_list[-1] == '' \
+                                    and all(separator.strip() == ',' for separator in string_list[2:-1:2]):
+                                strings = [sys.intern(s) for s in string_list[1::2]]
+                                node.add_property(key, strings)
+                                if __debug__ and DEBUG:
+                                    print('multi string')
+                                    for s in strings:
+                                        print(f'        |{s}|')
+                                continue
+                        elif first_char == '<':
+                            cell = Regex.cell.match(value)
+                            if cell:
+                                if __debug__ and DEBUG:
+                                    print('cell')
+                                    for e in cell[1].split(): # the elements are only split to be printed (cells are not stored yet)
+                                        print(f'        |{e}|')
+                                continue
+                        elif first_char == '&':
+                            alias = Regex.alias.match(value)
+                            if alias:
+                                if __debug__ and DEBUG:
+                                    print('alias')
+                                    print(f'        |{alias.groups()[0]}|')
+                        elif first_char == '[':
+                            binary_property = Regex.binary_property.match(value)
+                            if binary_property:
+                                elements = list(bytes.fromhex(''.join(Regex.binary_element.findall(value)))) # one int per byte
+                                node.add_property(key, elements)
+                                if __debug__ and DEBUG:
+                                    print('array')
+                                    for e in elements:
+                                        print(f'        |{e:#04x}|')
+                                continue
 
-                        string_list = re.match(r'^("[^\n;"]*"\s*,\s*?)+"[^\n;"]*"$', value)
-                        if string_list:
-                            strings = re.findall(r'"([^\n;"]*)"', value)
-                            node.add_property(key, list(strings))
-                            if DEBUG:
-                                print('multi string')
-                                for s in strings:
-                                    print(f'        |{s.groups()[0]}|')
-                            continue
-
-                        cell = re.match(r'^<((?:&?[\w]+\s*)+)>$', value)
-                        if cell:
-                            elements = cell.groups()[0].split()
-                            if DEBUG:
-                                print('cell')
-                                for e in elements:
-                                    print(f'        |{e}|')
+                    else:
+                        '''this line is just an empty property (like wakeup-source or interrupt-controller): its name is the whole line'''
+                        empty_property = Regex.empty_property.match(line)
+                        if empty_property:
+                            node.add_property(line, True)
+                            if __debug__ and DEBUG:
+                                print(f'    |{line}| -- empty')
                             continue
 
-                        alias = re.match(r'^(&[\w]+)$', value)
-                        if alias:
-                            if DEBUG:
-                                print('alias')
-                                print(f'        |{alias.groups()[0]}|')
+    return root_nodes
 
-                    else:
-                        '''this line is just a binary-property (like wakeup-source or interrupt-controller)'''
-                        binary_property = re.match(r'^\[(?:\s*([a-fA-F0-9xX]+)\s*)+\]$', value)
-                        if binary_property:
-                            elements = re.finditer(r'([a-fA-F0-9xX]+)', value)
-                            if DEBUG:
-                                print('array')
-                                for e in elements:
-                                    print(f'        |{e.groups()[0]}|')
-                            continue
+CACHE_VERSION:Final[int]=2
+'''part of the parse_device_tree_cached key: bump it whenever the parser output or DeviceTreeNode changes, so older pickles are parsed again'''
 
+def parse_device_tree_cached(file_path:Path, cache_dir:Path=None) -> List[DeviceTreeNode]:
+    '''same as parse_device_tree, but the result is pickled in cache_dir (~/.cache/dtreader by default) and reused while the file keeps
+    its modification time and size (included .dtsi files almost never change between runs)
+    the cache never makes a parse fail: when it can not be read or written, the file is just parsed'''
+    if not file_path.is_file():
+        '''a missing path or a directory: parse_device_tree raises the same error as the uncached call'''
+        return parse_device_tree(file_path)
+
+    if cache_dir == None:
+        try:
+            cache_dir = Path.home()/'.cache'/'dtreader'
+        except RuntimeError:
+            '''no home directory to keep the cache in'''
+            return parse_device_tree(file_path)
+
+    stat = file_path.stat()
+    key = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache_file = cache_dir / f'{hashlib.sha1(str(file_path.resolve()).encode()).hexdigest()}.pkl'
+
+    try:
+        cached = pickle.loads(cache_file.read_bytes())
+        if cached['key'] == key:
+            return cached['root_nodes']
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError, ValueError, AttributeError, ImportError):
+        '''a missing, unreadable, corrupted or outdated cache file is just parsed again'''
+
+    root_nodes = parse_device_tree(file_path)
+
+    temporary_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        temporary_file.write_bytes(pickle.dumps({'key': key, 'root_nodes': root_nodes}, protocol=pickle.HIGHEST_PROTOCOL))
+        os.replace(temporary_file, cache_file) # atomic, so a concurrent run never reads a half written cache
+    except OSError:
+        '''the cache could not be written (read only or full disk...): the parse itself still succeeded'''
+        try:
+            temporary_file.unlink()
+        except OSError:
+            pass
+
+    return root_nodes
+
+def parse_device_trees(file_paths:List[Path]) -> Dict[Path, List[DeviceTreeNode]]:
+    '''parses every file on its own process (each file is independent and the parsing is CPU bound)
+    returns the root nodes of each distinct file, keyed by its path, in the order each path first appears in file_paths
+    (a path given more than once is parsed once)'''
+    file_paths = list(dict.fromkeys(file_paths))
+    if len(file_paths) < 2:
+        return {file_path: parse_device_tree(file_path) for file_path in file_paths}
+
+    with ProcessPoolExecutor() as executor:
+        return dict(zip(file_paths, executor.map(parse_device_tree, file_paths)))
 
 if __name__ == "__main__":
     # parse_device_tree(Path("/home/grilo/linux-toradex/arch/arm/boot/dts/imx6qdl.dtsi"))
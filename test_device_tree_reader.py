@@ -0,0 +1,122 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from typing import Dict
+
+from device_tree_reader import Regex, DeviceTreeNode, parse_device_tree, parse_device_tree_cached, blank_comments
+
+weim_cs_timing = '<0x00010081 0x00000000 0x04000000 0x00000000 0x04000040 0x00000000>'
+'''fsl,weim-cs-timing of imx6dl-colibri-eval-v3, the value that made the old cell regex backtrack exponentially when followed by ", <0>"'''
+
+class LinearTimeTest(unittest.TestCase):
+    '''values that are almost (but not) a match have to fail fast: the old nested quantifiers took exponential time on them'''
+
+    time_limit = 0.5
+    '''seconds: a linear match takes microseconds here, an exponential one does not finish'''
+
+    def assert_fails_fast(self, pattern, value:str):
+        start = time.perf_counter()
+        self.assertIsNone(pattern.match(value))
+        self.assertLess(time.perf_counter() - start, self.time_limit)
+
+    def test_cell(self):
+        self.assertIsNotNone(Regex.cell.match(weim_cs_timing))
+        self.assert_fails_fast(Regex.cell, f'{weim_cs_timing}, <0>')
+        self.assert_fails_fast(Regex.cell, f'{weim_cs_timing[:-1]} {weim_cs_timing[1:-1] * 20}>, <0>')
+        self.assert_fails_fast(Regex.cell, '<' + ' '.join(['0x00010081'] * 5000) + ' ,>')
+
+    def test_binary(self):
+        self.assertIsNotNone(Regex.binary_property.match('[00 11 22]'))
+        self.assert_fails_fast(Regex.binary_property, '[' + '0' * 200000 + ' x')
+        self.assert_fails_fast(Regex.binary_property, '[' + '00 ' * 100000)
+
+def parse(text:str) -> DeviceTreeNode:
+    '''parses text as a device tree file, returning its root node'''
+    with tempfile.TemporaryDirectory() as directory:
+        file_path = Path(directory) / 'test.dts'
+        file_path.write_text(text)
+        return parse_device_tree(file_path)[0]
+
+def children(node:DeviceTreeNode) -> Dict[str, DeviceTreeNode]:
+    return {child.name: child for child in node.children}
+
+class CommentTest(unittest.TestCase):
+
+    def test_braces_inside_comments(self):
+        root = parse('/ {\n\t/* disabled {\n\t}; */\n\tmodel = "x"; // other {\n\tchild@1 {\n\t\tstatus = "okay";\n\t};\n};\n')
+        self.assertEqual(list(children(root)), ['child'])
+        self.assertEqual(root._properties, {'model': '"x"'})
+        self.assertEqual(children(root)['child']._properties, {'status': '"okay"'})
+
+    def test_comments_inside_values(self):
+        root = parse('/ {\n\treg /* address */ = <0x1 /* size */ 0x2>; // trailing\n\tstatus = "okay"; /* multi\n\tline */\n};\n')
+        self.assertEqual(root._properties, {'status': '"okay"'})
+
+    def test_comment_markers_inside_strings(self):
+        root = parse('/ {\n\tfoo {\n\t\tpath = "a/*b";\n\t};\n\tbar {\n\t};\n\tbaz {\n\t\tc = "*/";\n\t};\n};\n')
+        self.assertEqual(list(children(root)), ['foo', 'bar', 'baz'])
+        self.assertEqual(children(root)['foo']._properties, {'path': '"a/*b"'})
+        self.assertEqual(children(root)['baz']._properties, {'c': '"*/"'})
+
+    def test_url_inside_strings(self):
+        root = parse('/ {\n\tfoo { url = "http://x"; };\n\tnext {\n\t\turl = "http://y"; wakeup-source;\n\t};\n};\n')
+        self.assertEqual(list(children(root)), ['foo', 'next'])
+        self.assertEqual(children(root)['foo']._properties, {'url': '"http://x"'})
+        self.assertEqual(children(root)['next']._properties, {'url': '"http://y"', 'wakeup-source': True})
+
+    def test_escaped_quotes(self):
+        self.assertEqual(blank_comments(b'a = "say \\"// hi\\""; // comment\n'), b'a = "say \\"// hi\\"";           \n')
+        self.assertEqual(blank_comments(b'a = "\\\\"; // comment\n'), b'a = "\\\\";           \n')
+
+class BinaryPropertyTest(unittest.TestCase):
+
+    def test_bytestrings(self):
+        root = parse('/ {\n\ta = [00 11 22];\n\tb = [000012345678];\n\tc = [0x01 0x23 0x45 0x67];\n\td = [0x0000 12];\n};\n')
+        self.assertEqual(root._properties, {'a': [0x00, 0x11, 0x22], 'b': [0x00, 0x00, 0x12, 0x34, 0x56, 0x78], 'c': [0x01, 0x23, 0x45, 0x67], 'd': [0x00, 0x00, 0x12]})
+
+    def test_odd_digits(self):
+        for value in ['[123]', '[0x1]', '[00 1]', '[00x1]', '[x1]']:
+            self.assertIsNone(Regex.binary_property.match(value), value)
+        root = parse('/ {\n\ta = [123];\n\tb = [00];\n};\n')
+        self.assertEqual(root._properties, {'b': [0x00]})
+
+class EmptyPropertyTest(unittest.TestCase):
+
+    def test_first_statement(self):
+        root = parse('/ {\n\tinterrupt-controller;\n\t#interrupt-cells = <3>;\n\twakeup-source;\n};\n')
+        self.assertEqual(root._properties, {'interrupt-controller': True, 'wakeup-source': True})
+
+class ErrorTest(unittest.TestCase):
+
+    def test_nested_overlay(self):
+        with self.assertRaises(KeyError) as raised:
+            parse('/ {\n\t&y {\n\t};\n};\n')
+        self.assertEqual(raised.exception.args[0], 'This &y { node is only a phandle. Should this be inside a node (/)? Is this allowable?')
+
+class CacheTest(unittest.TestCase):
+
+    def test_same_errors_as_uncached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache_dir = Path(directory) / 'cache'
+            for file_path in [Path(directory) / 'missing.dts', Path(directory)]:
+                with self.assertRaises(FileExistsError) as uncached:
+                    parse_device_tree(file_path)
+                with self.assertRaises(FileExistsError) as cached:
+                    parse_device_tree_cached(file_path, cache_dir)
+                self.assertEqual(cached.exception.args, uncached.exception.args)
+            self.assertFalse(cache_dir.exists())
+
+    def test_reuses_the_cached_tree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = Path(directory) / 'test.dts'
+            file_path.write_text('/ {\n\tmodel = "x";\n\tchild {\n\t\twakeup-source;\n\t};\n};\n')
+            cache_dir = Path(directory) / 'cache'
+            parsed = parse_device_tree_cached(file_path, cache_dir)
+            self.assertEqual(len(list(cache_dir.iterdir())), 1)
+            cached = parse_device_tree_cached(file_path, cache_dir)
+            self.assertEqual(repr(cached), repr(parsed))
+            self.assertEqual(cached[0].children[0]._properties, {'wakeup-source': True})
+
+if __name__ == '__main__':
+    unittest.main()